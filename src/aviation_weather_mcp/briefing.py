@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import re
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from .streaming import project
+from .exceptions import ValidationError
+from .validation import station_id
+
+logger = logging.getLogger(__name__)
+
+_AIRPORT_ID_RE = re.compile(r"^[A-Z0-9]{3,4}$")
+
+# Station and airport reference data changes rarely
+REFERENCE_TTL = 24 * 3600.0
+
+# Fields kept per product in the merged briefing
+METAR_FIELDS = ["icaoId", "obsTime", "fltCat", "temp", "dewp", "wdir", "wspd", "wgst", "visib", "altim", "clouds", "rawOb"]
+TAF_FIELDS = ["icaoId", "issueTime", "validTimeFrom", "validTimeTo", "rawTAF"]
+PIREP_FIELDS = ["obsTime", "acType", "fltLvl", "lat", "lon", "rawOb"]
+STATION_FIELDS = ["icaoId", "site", "lat", "lon", "elev", "state", "country"]
+AIRPORT_FIELDS = ["icaoId", "name", "lat", "lon", "elev", "runways", "freqs"]
+HAZARD_FIELDS = ["hazard", "severity", "product", "validTime", "validTimeFrom", "validTimeTo",
+                 "altitudeLow1", "altitudeHi1", "base", "top", "rawAirSigmet", "rawSigmet", "cwaText", "coords"]
+
+HAZARD_ENDPOINTS = {
+    "sigmet": ("airsigmet", {"format": "json"}),
+    "isigmet": ("isigmet", {"format": "json"}),
+    "gairmet": ("gairmet", {"format": "json"}),
+    "cwa": ("cwa", {}),
+}
+
+
+def _timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _compact(record: Any, fields: List[str]) -> Any:
+    """Project a record, keeping it whole if none of the expected fields are present"""
+    return project(record, fields) or record
+
+
+def _records(result: Any) -> List[Any]:
+    return result if isinstance(result, list) else [result] if result else []
+
+
+def covers(record: Dict[str, Any], lat: float, lon: float) -> bool:
+    """Whether a hazard polygon contains the point; records without a polygon are kept"""
+    coords = record.get("coords")
+    if not isinstance(coords, list) or len(coords) < 3:
+        return True
+    try:
+        polygon = [(float(c["lat"]), float(c["lon"])) for c in coords]
+    except (KeyError, TypeError, ValueError):
+        return True
+    inside = False
+    for (lat0, lon0), (lat1, lon1) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (lon0 > lon) != (lon1 > lon):
+            crossing = lat0 + (lon - lon0) * (lat1 - lat0) / (lon1 - lon0)
+            if lat < crossing:
+                inside = not inside
+    return inside
+
+
+class ReferenceCache:
+    """Long-lived cache of station and airport reference records"""
+
+    def __init__(self, client, ttl: float = REFERENCE_TTL):
+        self.client = client
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    async def get(self, kind: str, station: str) -> Tuple[float, Any]:
+        """Return (fetched_at, record) for 'station' or 'airport' reference data"""
+        key = (kind, station)
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                return entry
+            if kind == "station":
+                result = await self.client.get_station_info(ids=station, format="json")
+            else:
+                result = await self.client.get_airport_info(ids=station, format="json")
+            records = _records(result)
+            entry = (time.time(), records[0] if records else None)
+            if entry[1] is not None:
+                self._entries[key] = entry
+            return entry
+
+
+async def _section(fetch: Awaitable[Any]) -> Dict[str, Any]:
+    """Run one product fetch, recording when it completed or why it failed"""
+    try:
+        result = await fetch
+    except Exception as e:
+        logger.warning(f"Briefing section failed: {e}")
+        return {"fetched": _timestamp(time.time()), "error": str(e)}
+    if isinstance(result, tuple):
+        fetched_at, data = result
+        return {"fetched": _timestamp(fetched_at), "data": data}
+    return {"fetched": _timestamp(time.time()), "data": result}
+
+
+async def _stream_hazards(client, endpoint: str, params: Dict[str, Any]) -> List[Any]:
+    """Stream a hazard product, keeping compact records only"""
+    hazards = []
+    async with aclosing(client.stream_records(endpoint, params)) as records:
+        async for record in records:
+            hazards.append(_compact(record, HAZARD_FIELDS))
+    return hazards
+
+
+async def build_briefing(client,
+                         reference: ReferenceCache,
+                         station: str,
+                         pirep_distance: int = 100,
+                         pirep_age: int = 2) -> Dict[str, Any]:
+    """Fetch every product for a station concurrently and merge them.
+
+    Each section carries its own 'fetched' timestamp; a failing product
+    yields an 'error' entry instead of failing the whole briefing.
+    """
+    station = station_id("station", station)
+    if not _AIRPORT_ID_RE.match(station):
+        raise ValidationError(f"station must be a single 3-4 character airport id, got '{station}'")
+
+    async def metar():
+        return [_compact(r, METAR_FIELDS) for r in _records(await client.get_metar(ids=station, format="json"))]
+
+    async def taf():
+        return [_compact(r, TAF_FIELDS) for r in _records(await client.get_taf(ids=station, format="json"))]
+
+    async def pirep():
+        result = await client.get_pirep(id=station, format="json", distance=pirep_distance, age=pirep_age)
+        return [_compact(r, PIREP_FIELDS) for r in _records(result)]
+
+    async def reference_record(kind: str, fields: List[str]):
+        fetched_at, record = await reference.get(kind, station)
+        return fetched_at, _compact(record, fields) if record is not None else None
+
+    fetches = {
+        "metar": metar(),
+        "taf": taf(),
+        "pirep": pirep(),
+        "station": reference_record("station", STATION_FIELDS),
+        "airport": reference_record("airport", AIRPORT_FIELDS),
+    }
+    for name, (endpoint, params) in HAZARD_ENDPOINTS.items():
+        fetches[name] = _stream_hazards(client, endpoint, params)
+
+    sections = dict(zip(fetches, await asyncio.gather(*(_section(f) for f in fetches.values()))))
+
+    # Keep only hazards whose area covers the station, once its location is known
+    location: Optional[Tuple[float, float]] = None
+    for name in ("station", "airport"):
+        record = sections[name].get("data")
+        if isinstance(record, dict) and record.get("lat") is not None and record.get("lon") is not None:
+            location = (float(record["lat"]), float(record["lon"]))
+            break
+    for name in HAZARD_ENDPOINTS:
+        hazards = sections[name].get("data")
+        if hazards is None:
+            continue
+        if location is None:
+            # Without a location the national list is not useful in a briefing
+            del sections[name]["data"]
+            sections[name]["count"] = len(hazards)
+            continue
+        hazards = [h for h in hazards if not isinstance(h, dict) or covers(h, *location)]
+        sections[name]["data"] = [
+            {k: v for k, v in h.items() if k != "coords"} if isinstance(h, dict) else h
+            for h in hazards
+        ]
+
+    return {"id": station, **sections}
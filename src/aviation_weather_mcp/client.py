@@ -1,7 +1,13 @@
+import asyncio
 import httpx
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Any
 from .exceptions import APIError, NetworkError, ValidationError
+from .scheduler import FairScheduler, current_session, remaining_time
+from .streaming import iter_json_records
+from .validation import normalize_params
 
 logger = logging.getLogger(__name__)
 
@@ -10,8 +16,10 @@ class AviationWeatherClient:
     
     BASE_URL = "https://aviationweather.gov/api/data"
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+    def __init__(self, timeout: float = 30.0, max_concurrency: int = 8):
+        self.timeout = timeout
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self.scheduler = FairScheduler(max_concurrency)
     
     async def close(self):
         """Close the HTTP client"""
@@ -21,9 +29,26 @@ class AviationWeatherClient:
         """Make an HTTP request to the API"""
         url = f"{self.BASE_URL}/{endpoint}"
         
-        # Remove None values from params
-        clean_params = {k: v for k, v in params.items() if v is not None}
+        # Validate and canonicalize before touching the network
+        clean_params = normalize_params(endpoint, params)
         
+        # Never wait longer than the caller is willing to
+        timeout = remaining_time(self.timeout)
+        if timeout <= 0:
+            raise NetworkError(f"Deadline exceeded before request to {url}")
+        
+        try:
+            return await asyncio.wait_for(self._send(url, clean_params), timeout)
+        except asyncio.TimeoutError:
+            raise NetworkError(f"Request to {url} timed out")
+    
+    async def _send(self, url: str, clean_params: Dict[str, Any]) -> Any:
+        """Send a request once the session is granted an upstream slot"""
+        async with self.scheduler.slot(current_session.get()):
+            return await self._get(url, clean_params)
+    
+    async def _get(self, url: str, clean_params: Dict[str, Any]) -> Any:
+        """Perform the HTTP GET and decode the response"""
         try:
             logger.info(f"Making request to {url} with params: {clean_params}")
             response = await self.client.get(url, params=clean_params)
@@ -43,6 +68,68 @@ class AviationWeatherClient:
         except Exception as e:
             raise NetworkError(f"Network error: {str(e)}")
     
+    async def stream_records(self, endpoint: str, params: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Stream the records of a JSON/GeoJSON response as they are decoded.
+        
+        Holds an upstream slot until the iteration finishes or is closed, so
+        consume it inside `contextlib.aclosing` when stopping early.
+        """
+        url = f"{self.BASE_URL}/{endpoint}"
+        clean_params = normalize_params(endpoint, params)
+        
+        timeout = remaining_time(self.timeout)
+        if timeout <= 0:
+            raise NetworkError(f"Deadline exceeded before request to {url}")
+        deadline = time.monotonic() + timeout
+        
+        # The deadline covers the wait for a slot as well as the transfer
+        try:
+            await asyncio.wait_for(self.scheduler.acquire(current_session.get()), timeout)
+        except asyncio.TimeoutError:
+            raise NetworkError(f"Request to {url} timed out waiting for an upstream slot")
+        try:
+            try:
+                remaining = self._remaining(deadline, url)
+                logger.info(f"Streaming request to {url} with params: {clean_params}")
+                request = self.client.build_request("GET", url, params=clean_params, timeout=remaining)
+                response = await asyncio.wait_for(self.client.send(request, stream=True), remaining)
+                try:
+                    if response.is_error:
+                        await asyncio.wait_for(response.aread(), self._remaining(deadline, url))
+                        response.raise_for_status()
+                    async for record in iter_json_records(self._chunks(response, deadline, url)):
+                        yield record
+                finally:
+                    await response.aclose()
+            except asyncio.TimeoutError:
+                raise NetworkError(f"Request to {url} timed out")
+            except httpx.TimeoutException:
+                raise NetworkError(f"Request to {url} timed out")
+            except httpx.HTTPStatusError as e:
+                raise APIError(f"API request failed with status {e.response.status_code}: {e.response.text}")
+            except httpx.HTTPError as e:
+                raise NetworkError(f"Network error: {str(e)}")
+        finally:
+            self.scheduler.release()
+    
+    @staticmethod
+    def _remaining(deadline: float, url: str) -> float:
+        """Seconds left before deadline, failing once it has passed"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise NetworkError(f"Request to {url} timed out")
+        return remaining
+    
+    async def _chunks(self, response: httpx.Response, deadline: float, url: str) -> AsyncIterator[str]:
+        """Yield decoded body chunks, bounding every read by the deadline"""
+        async with aclosing(response.aiter_text()) as chunks:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self._remaining(deadline, url))
+                except StopAsyncIteration:
+                    return
+                yield chunk
+    
     async def get_metar(self, 
                        ids: Optional[str] = None,
                        format: str = "json",
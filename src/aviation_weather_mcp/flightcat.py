@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import math
+import time
+from array import array
+from contextlib import aclosing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .validation import request_key
+
+logger = logging.getLogger(__name__)
+
+# Flight categories, ordered from best to worst so larger codes are worse
+VFR, MVFR, IFR, LIFR = 0, 1, 2, 3
+CATEGORY_NAMES = ("VFR", "MVFR", "IFR", "LIFR")
+
+# Contiguous US, used when neither bbox nor state is given
+CONUS_BBOX = "24,-125,50,-66"
+
+# METARs are hourly (plus specials); a few minutes of staleness is acceptable
+SNAPSHOT_TTL = 300.0
+# Each snapshot holds a full set of columns; bound how many distinct queries are kept
+MAX_SNAPSHOTS = 32
+
+NO_CEILING = 99999.0
+CEILING_COVERS = ("BKN", "OVC", "OVX")
+
+
+def parse_visibility(value: Any) -> float:
+    """Parse a METAR JSON visibility ('10+', '1 1/2', 0.25, ...) in statute miles"""
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().rstrip("+").replace("SM", "").lstrip("PM")
+    total = 0.0
+    try:
+        for part in text.split():
+            if "/" in part:
+                num, den = part.split("/", 1)
+                total += float(num) / float(den)
+            else:
+                total += float(part)
+    except (ValueError, ZeroDivisionError):
+        return math.nan
+    return total if text else math.nan
+
+
+def parse_ceiling(metar: Dict[str, Any]) -> float:
+    """Lowest broken/overcast layer or vertical visibility, in feet AGL"""
+    ceiling = NO_CEILING
+    for layer in metar.get("clouds") or []:
+        base = layer.get("base")
+        if layer.get("cover") in CEILING_COVERS and base is not None:
+            ceiling = min(ceiling, float(base))
+    vert_vis = metar.get("vertVis")
+    if vert_vis is not None:
+        # Vertical visibility may be reported in hundreds of feet
+        ceiling = min(ceiling, float(vert_vis) * (100 if float(vert_vis) < 100 else 1))
+    return ceiling
+
+
+def keep_latest(latest: Dict[str, Dict[str, Any]], record: Dict[str, Any]) -> None:
+    """Keep only the latest located report per station (hours > 1 returns history)"""
+    station = record.get("icaoId")
+    if not station or record.get("lat") is None or record.get("lon") is None:
+        return
+    current = latest.get(station)
+    if current is None or (record.get("obsTime") or 0) > (current.get("obsTime") or 0):
+        latest[station] = record
+
+
+class MetarColumns:
+    """Column-oriented snapshot of METAR observations.
+
+    Each observation is one index across the parallel arrays; categories
+    are computed once for the whole snapshot when it is built.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]], fetched_at: Optional[float] = None):
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.ids: List[str] = []
+        self.obs_times: List[Any] = []
+        self.lats = array("d")
+        self.lons = array("d")
+        self.ceilings = array("f")
+        self.visibilities = array("f")
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            keep_latest(latest, record)
+
+        for station, record in latest.items():
+            self.ids.append(station)
+            self.obs_times.append(record.get("obsTime"))
+            self.lats.append(float(record["lat"]))
+            self.lons.append(float(record["lon"]))
+            self.ceilings.append(parse_ceiling(record))
+            self.visibilities.append(parse_visibility(record.get("visib")))
+
+        self.categories = array("b", map(self._categorize, self.ceilings, self.visibilities))
+        self.severity = [self._severity(i) for i in range(len(self.ids))]
+
+    @staticmethod
+    def _categorize(ceiling: float, visibility: float) -> int:
+        if ceiling < 500 or visibility < 1:
+            return LIFR
+        if ceiling < 1000 or visibility < 3:
+            return IFR
+        if ceiling <= 3000 or visibility <= 5:
+            return MVFR
+        return VFR
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _station(self, i: int) -> Dict[str, Any]:
+        ceiling = self.ceilings[i]
+        visibility = self.visibilities[i]
+        return {
+            "id": self.ids[i],
+            "cat": CATEGORY_NAMES[self.categories[i]],
+            "ceil": int(ceiling) if ceiling < NO_CEILING else None,
+            "visib": round(visibility, 2) if not math.isnan(visibility) else None,
+            "lat": self.lats[i],
+            "lon": self.lons[i],
+        }
+
+    def _severity(self, i: int) -> Tuple[int, float, float]:
+        """Sort key: worse category first, then lower ceiling, then lower visibility"""
+        visibility = self.visibilities[i]
+        return (-self.categories[i], self.ceilings[i], visibility if not math.isnan(visibility) else NO_CEILING)
+
+    def summarize(self, cell_size: float = 1.0, worst: int = 10) -> Dict[str, Any]:
+        """Counts per category overall and per lat/lon cell, plus the worst stations"""
+        totals = [0, 0, 0, 0]
+        severity = self.severity
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (category, lat, lon) in enumerate(zip(self.categories, self.lats, self.lons)):
+            totals[category] += 1
+            key = (math.floor(lat / cell_size), math.floor(lon / cell_size))
+            cell = cells.get(key)
+            if cell is None:
+                # Four category counts followed by the index of the worst station
+                cells[key] = cell = [0, 0, 0, 0, i]
+            cell[category] += 1
+            if severity[i] < severity[cell[4]]:
+                cell[4] = i
+
+        grid = []
+        for (row, col), cell in sorted(cells.items()):
+            if cell[IFR] == 0 and cell[LIFR] == 0 and cell[MVFR] == 0:
+                continue
+            entry = {
+                "lat": row * cell_size,
+                "lon": col * cell_size,
+                "worst": self.ids[cell[4]],
+                "worst_cat": CATEGORY_NAMES[self.categories[cell[4]]],
+            }
+            entry.update({name: count for name, count in zip(CATEGORY_NAMES, cell) if count})
+            grid.append(entry)
+
+        ranked = sorted(
+            (i for i, category in enumerate(self.categories) if category != VFR),
+            key=severity.__getitem__,
+        )
+        return {
+            "stations": len(self),
+            "counts": dict(zip(CATEGORY_NAMES, totals)),
+            "cell_size": cell_size,
+            "cells": grid,
+            "worst": [self._station(i) for i in ranked[:worst]],
+        }
+
+
+class MetarSnapshotCache:
+    """Short-lived cache of decoded METAR snapshots keyed by query"""
+
+    def __init__(self,
+                 client,
+                 ttl: float = SNAPSHOT_TTL,
+                 max_snapshots: int = MAX_SNAPSHOTS,
+                 clock: Callable[[], float] = time.time):
+        self.client = client
+        self.ttl = ttl
+        self.max_snapshots = max_snapshots
+        self.clock = clock
+        self._snapshots: Dict[str, MetarColumns] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, ids: Optional[str] = None, bbox: Optional[str] = None) -> MetarColumns:
+        """Return decoded METAR columns, fetching at most once per TTL"""
+        key = request_key("metar", {"ids": ids, "bbox": bbox, "format": "json"})
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and self.clock() - snapshot.fetched_at < self.ttl:
+            return snapshot
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and self.clock() - snapshot.fetched_at < self.ttl:
+                return snapshot
+            # Decode as the response streams in, keeping one report per station
+            latest: Dict[str, Dict[str, Any]] = {}
+            params = {"ids": ids, "bbox": bbox, "format": "json"}
+            async with aclosing(self.client.stream_records("metar", params)) as records:
+                async for record in records:
+                    if isinstance(record, dict):
+                        keep_latest(latest, record)
+            snapshot = MetarColumns(latest.values(), fetched_at=self.clock())
+            self._snapshots.pop(key, None)
+            self._snapshots[key] = snapshot
+            self._evict()
+            logger.info(f"Cached METAR snapshot {key}: {len(snapshot)} stations")
+            return snapshot
+
+    def _evict(self) -> None:
+        """Drop expired snapshots, then the oldest beyond max_snapshots, and their locks"""
+        now = self.clock()
+        for key in [k for k, snapshot in self._snapshots.items() if now - snapshot.fetched_at >= self.ttl]:
+            del self._snapshots[key]
+        # Snapshots are inserted in fetch order, so the oldest come first
+        for key in list(self._snapshots)[:max(0, len(self._snapshots) - self.max_snapshots)]:
+            del self._snapshots[key]
+        for key in [k for k, lock in self._locks.items() if k not in self._snapshots and not lock.locked()]:
+            del self._locks[key]
@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+
+DEFAULT_SESSION = "default"
+
+# Identity and deadline of the tool call currently being served
+current_session: contextvars.ContextVar[Hashable] = contextvars.ContextVar("current_session", default=DEFAULT_SESSION)
+current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("current_deadline", default=None)
+
+
+def bind_request(session: Hashable, timeout: Optional[float] = None) -> None:
+    """Attach a session and optional relative deadline to the current task"""
+    current_session.set(session)
+    current_deadline.set(time.monotonic() + timeout if timeout is not None else None)
+
+
+def remaining_time(default: float) -> float:
+    """Seconds left before the current deadline, capped at default"""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return default
+    return min(default, deadline - time.monotonic())
+
+
+class FairScheduler:
+    """Round-robin over a fixed number of upstream slots.
+
+    Free slots are handed out immediately while nobody is waiting. Once
+    callers queue up, each released slot goes to the next session in the
+    ring, so a session with many pending requests cannot starve the others.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._active = 0
+        self._queues: Dict[Hashable, Deque[asyncio.Future]] = {}
+        self._ring: Deque[Hashable] = deque()
+
+    async def acquire(self, session: Hashable) -> None:
+        if self._active < self.slots and not self._ring:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(session)
+        if queue is None:
+            self._queues[session] = queue = deque()
+            self._ring.append(session)
+        queue.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as we were cancelled; pass it on
+                self.release()
+            else:
+                self._discard(session, future)
+            raise
+
+    def release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, session: Hashable) -> AsyncIterator[None]:
+        """Hold one upstream slot for the duration of the block"""
+        await self.acquire(session)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _discard(self, session: Hashable, future: asyncio.Future) -> None:
+        queue = self._queues.get(session)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            self._drop(session)
+
+    def _drop(self, session: Hashable) -> None:
+        del self._queues[session]
+        try:
+            self._ring.remove(session)
+        except ValueError:
+            pass
+
+    def _dispatch(self) -> None:
+        while self._active < self.slots and self._ring:
+            session = self._ring[0]
+            queue = self._queues[session]
+            future = queue.popleft()
+
+            if queue:
+                self._ring.rotate(-1)
+            else:
+                self._drop(session)
+
+            if future.done():
+                continue
+            future.set_result(None)
+            self._active += 1
@@ -1,10 +1,17 @@
+import functools
 import logging
 import json
 import os
-from typing import Any, Optional
+from contextlib import aclosing
+from typing import Any, Dict, Optional
 
 from mcp.server.fastmcp import FastMCP
 from .client import AviationWeatherClient
+from .scheduler import bind_request
+from .briefing import ReferenceCache, build_briefing
+from .flightcat import CONUS_BBOX, MetarSnapshotCache
+from .streaming import parse_fields, project
+from .windtemp import WindTempCache, point_wind, route_winds
 from .exceptions import AviationWeatherError, APIError, NetworkError, ValidationError
 
 # Configure logging
@@ -25,6 +32,44 @@ app = FastMCP("Aviation Weather MCP Server")
 # Global client instance
 client = None
 
+# Decoded winds-aloft grids, shared across tool calls
+wind_cache = None
+
+# Decoded METAR snapshots for regional summaries
+metar_cache = None
+
+# Station and airport reference data for briefings
+reference_cache = None
+
+# Formats whose responses are streamed and re-encoded record by record
+STREAMABLE_FORMATS = ("json", "geojson")
+PROGRESS_EVERY = 500
+
+def _bind_tool_call():
+    """Tag upstream work with the calling session and its deadline.
+
+    Callers may set a relative deadline in seconds with `_meta.timeout` on
+    the tool call; upstream requests then never outlive it.
+    """
+    try:
+        request_context = app.get_context().request_context
+    except (LookupError, ValueError):
+        return
+    timeout = getattr(request_context.meta, "timeout", None)
+    try:
+        timeout = float(timeout) if timeout is not None else None
+    except (TypeError, ValueError):
+        timeout = None
+    bind_request(id(request_context.session), timeout)
+
+def bound_tool(fn):
+    """Bind the calling session and deadline before running a tool"""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        _bind_tool_call()
+        return await fn(*args, **kwargs)
+    return wrapper
+
 async def get_client():
     """Get or create the aviation weather client"""
     global client
@@ -32,14 +77,74 @@ async def get_client():
         client = AviationWeatherClient()
     return client
 
+async def get_wind_cache():
+    """Get or create the winds-aloft grid cache"""
+    global wind_cache
+    if wind_cache is None:
+        wind_cache = WindTempCache(await get_client())
+    return wind_cache
+
+async def get_metar_cache():
+    """Get or create the METAR snapshot cache"""
+    global metar_cache
+    if metar_cache is None:
+        metar_cache = MetarSnapshotCache(await get_client())
+    return metar_cache
+
+async def _stream_json(endpoint: str, params: Dict[str, Any], fields: str = "") -> str:
+    """Fetch a JSON/GeoJSON product record by record and encode it incrementally.
+
+    Records are projected and serialized as they arrive, so the decoded
+    response is never held in memory as a whole. Progress notifications
+    are sent when the caller supplied a progress token.
+    """
+    client = await get_client()
+    projection = parse_fields(fields)
+    ctx = app.get_context()
+    parts = []
+    async with aclosing(client.stream_records(endpoint, params)) as records:
+        async for record in records:
+            parts.append(json.dumps(project(record, projection)))
+            if len(parts) % PROGRESS_EVERY == 0:
+                try:
+                    await ctx.report_progress(len(parts))
+                except (LookupError, ValueError):
+                    pass
+    body = ", ".join(parts)
+    if params.get("format") == "geojson":
+        return f'{{"type": "FeatureCollection", "features": [{body}]}}'
+    return f"[{body}]"
+
+async def get_reference_cache():
+    """Get or create the station/airport reference cache"""
+    global reference_cache
+    if reference_cache is None:
+        reference_cache = ReferenceCache(await get_client())
+    return reference_cache
+
+def _parse_route(route: str):
+    """Parse a 'lat,lon;lat,lon;...' route string into coordinate pairs"""
+    points = []
+    for point in route.split(";"):
+        if not point.strip():
+            continue
+        try:
+            lat, lon = (float(part) for part in point.split(","))
+        except ValueError:
+            raise ValidationError(f"Invalid route point '{point.strip()}', expected 'lat,lon'")
+        points.append((lat, lon))
+    return points
+
 @app.tool()
+@bound_tool
 async def get_metar(
     ids: str = "",
     format: str = "json",
     taf: bool = False,
     hours: Optional[int] = None,
     bbox: str = "",
-    date: str = ""
+    date: str = "",
+    fields: str = ""
 ) -> str:
     """
     Get METAR weather observations from aviation weather stations.
@@ -51,11 +156,21 @@ async def get_metar(
         hours: Hours back to search
         bbox: Geographic bounding box as 'lat0,lon0,lat1,lon1' (e.g. '40,-90,45,-85')
         date: Date in format 'yyyymmdd_hhmm' or 'yyyy-mm-ddThh:mm:ssZ'
+        fields: Comma-separated record fields to keep for 'json'/'geojson' (e.g. 'icaoId,fltCat,rawOb')
     
     Returns:
         Weather observation data in the requested format
     """
     try:
+        if format.lower() in STREAMABLE_FORMATS:
+            return await _stream_json("metar", {
+                "ids": ids if ids else None,
+                "format": format.lower(),
+                "taf": taf,
+                "hours": hours,
+                "bbox": bbox if bbox else None,
+                "date": date if date else None
+            }, fields)
         client = await get_client()
         result = await client.get_metar(
             ids=ids if ids else None,
@@ -71,6 +186,45 @@ async def get_metar(
         raise AviationWeatherError(f"Failed to get METAR data: {e}")
 
 @app.tool()
+@bound_tool
+async def get_flight_category_summary(
+    bbox: str = "",
+    state: str = "",
+    cell_size: float = 1.0,
+    worst: int = 10
+) -> str:
+    """
+    Summarize VFR/MVFR/IFR/LIFR conditions over a region from current METARs.
+    
+    Args:
+        bbox: Geographic bounding box as 'lat0,lon0,lat1,lon1' (e.g. '40,-90,45,-85')
+        state: Two-letter state code (e.g. 'WA'); ignored when bbox is given
+        cell_size: Grid cell size in degrees for the per-cell counts
+        worst: Number of worst-case stations to list
+    
+    Returns:
+        Category counts, non-VFR grid cells with their worst station, and the worst stations overall.
+        Defaults to the contiguous US when neither bbox nor state is given.
+    """
+    try:
+        if cell_size <= 0:
+            raise ValidationError("cell_size must be positive")
+        if worst < 0:
+            raise ValidationError("worst must not be negative")
+        cache = await get_metar_cache()
+        if bbox:
+            snapshot = await cache.get(bbox=bbox)
+        elif state:
+            snapshot = await cache.get(ids=f"@{state.upper().lstrip('@')}")
+        else:
+            snapshot = await cache.get(bbox=CONUS_BBOX)
+        return json.dumps(snapshot.summarize(cell_size=cell_size, worst=worst))
+    except Exception as e:
+        logger.error(f"Error getting flight category summary: {e}")
+        raise AviationWeatherError(f"Failed to get flight category summary: {e}")
+
+@app.tool()
+@bound_tool
 async def get_taf(
     ids: str = "",
     format: str = "json",
@@ -109,6 +263,7 @@ async def get_taf(
         raise AviationWeatherError(f"Failed to get TAF data: {e}")
 
 @app.tool()
+@bound_tool
 async def get_pirep(
     id: str = "",
     format: str = "json",
@@ -116,7 +271,8 @@ async def get_pirep(
     distance: Optional[int] = None,
     level: Optional[int] = None,
     inten: str = "",
-    date: str = ""
+    date: str = "",
+    fields: str = ""
 ) -> str:
     """
     Get pilot reports (PIREPs) from aviation weather.
@@ -129,11 +285,22 @@ async def get_pirep(
         level: Flight level +-3000' to search
         inten: Minimum intensity - 'lgt', 'mod', 'sev'
         date: Date in format 'yyyymmdd_hhmm' or 'yyyy-mm-ddThh:mm:ssZ'
+        fields: Comma-separated record fields to keep for 'json'/'geojson'
     
     Returns:
         Pilot report data in the requested format
     """
     try:
+        if format.lower() in STREAMABLE_FORMATS:
+            return await _stream_json("pirep", {
+                "id": id if id else None,
+                "format": format.lower(),
+                "age": age,
+                "distance": distance,
+                "level": level,
+                "inten": inten if inten else None,
+                "date": date if date else None
+            }, fields)
         client = await get_client()
         result = await client.get_pirep(
             id=id if id else None,
@@ -150,6 +317,7 @@ async def get_pirep(
         raise AviationWeatherError(f"Failed to get PIREP data: {e}")
 
 @app.tool()
+@bound_tool
 async def get_sigmet(
     format: str = "json",
     hazard: str = "",
@@ -182,6 +350,7 @@ async def get_sigmet(
         raise AviationWeatherError(f"Failed to get SIGMET data: {e}")
 
 @app.tool()
+@bound_tool
 async def get_isigmet(
     format: str = "json",
     hazard: str = "",
@@ -214,11 +383,13 @@ async def get_isigmet(
         raise AviationWeatherError(f"Failed to get International SIGMET data: {e}")
 
 @app.tool()
+@bound_tool
 async def get_gairmet(
     type: str = "",
     format: str = "json",
     hazard: str = "",
-    date: str = ""
+    date: str = "",
+    fields: str = ""
 ) -> str:
     """
     Get US Graphical AIRMETs (G-AIRMETs).
@@ -228,11 +399,19 @@ async def get_gairmet(
         format: Output format - 'decoded', 'json', 'geojson', 'xml'
         hazard: Hazard type - 'turb-hi', 'turb-lo', 'llws', 'sfc_wind', 'ifr', 'mtn_obs', 'ice', 'fzlvl'
         date: Date in format 'yyyymmdd_hhmm' or 'yyyy-mm-ddThh:mm:ssZ'
+        fields: Comma-separated record fields to keep for 'json'/'geojson'
     
     Returns:
         G-AIRMET data in the requested format
     """
     try:
+        if format.lower() in STREAMABLE_FORMATS:
+            return await _stream_json("gairmet", {
+                "type": type if type else None,
+                "format": format.lower(),
+                "hazard": hazard if hazard else None,
+                "date": date if date else None
+            }, fields)
         client = await get_client()
         result = await client.get_gairmet(
             type=type if type else None,
@@ -246,6 +425,7 @@ async def get_gairmet(
         raise AviationWeatherError(f"Failed to get G-AIRMET data: {e}")
 
 @app.tool()
+@bound_tool
 async def get_cwa(
     hazard: str = "",
     date: str = ""
@@ -272,6 +452,7 @@ async def get_cwa(
         raise AviationWeatherError(f"Failed to get CWA data: {e}")
 
 @app.tool()
+@bound_tool
 async def get_wind_temp(
     region: str = "",
     level: str = "",
@@ -301,6 +482,102 @@ async def get_wind_temp(
         raise AviationWeatherError(f"Failed to get wind/temp data: {e}")
 
 @app.tool()
+@bound_tool
+async def get_winds_aloft(
+    lat: float,
+    lon: float,
+    altitude: int,
+    region: str = "us",
+    fcst: str = "06"
+) -> str:
+    """
+    Get interpolated wind and temperature at a point and altitude from the FD winds aloft forecast.
+    
+    Args:
+        lat: Latitude in decimal degrees
+        lon: Longitude in decimal degrees
+        altitude: Altitude in feet MSL
+        region: Region - 'us', 'bos', 'mia', 'chi', 'dfw', 'slc', 'sfo', 'alaska', 'hawaii', 'other_pac'
+        fcst: Forecast cycle - '06', '12', '24'
+    
+    Returns:
+        Wind direction (true), speed (kt) and temperature (C) at the requested point
+    """
+    try:
+        cache = await get_wind_cache()
+        grids = await cache.for_altitude(altitude, region=region, fcst=fcst)
+        result = point_wind(grids, lat, lon, altitude)
+        return json.dumps({k: v for k, v in result.items() if k not in ("u", "v")})
+    except Exception as e:
+        logger.error(f"Error getting winds aloft: {e}")
+        raise AviationWeatherError(f"Failed to get winds aloft: {e}")
+
+@app.tool()
+@bound_tool
+async def get_route_winds(
+    route: str,
+    altitude: int,
+    tas: Optional[int] = None,
+    region: str = "us",
+    fcst: str = "06"
+) -> str:
+    """
+    Get headwind and crosswind components along a route from the FD winds aloft forecast.
+    
+    Args:
+        route: Route points as 'lat,lon;lat,lon;...' (e.g. '41.94,-72.68;42.36,-71.01')
+        altitude: Cruise altitude in feet MSL
+        tas: True airspeed in knots, to also compute groundspeed and time en route
+        region: Region - 'us', 'bos', 'mia', 'chi', 'dfw', 'slc', 'sfo', 'alaska', 'hawaii', 'other_pac'
+        fcst: Forecast cycle - '06', '12', '24'
+    
+    Returns:
+        Per-leg course, wind, headwind/crosswind components and a distance-weighted summary
+    """
+    try:
+        points = _parse_route(route)
+        cache = await get_wind_cache()
+        grids = await cache.for_altitude(altitude, region=region, fcst=fcst)
+        return json.dumps(route_winds(grids, points, altitude, tas=tas))
+    except Exception as e:
+        logger.error(f"Error getting route winds: {e}")
+        raise AviationWeatherError(f"Failed to get route winds: {e}")
+
+@app.tool()
+@bound_tool
+async def get_station_briefing(
+    station: str,
+    pirep_distance: int = 100,
+    pirep_age: int = 2
+) -> str:
+    """
+    Get a merged weather briefing for one airport in a single call.
+    
+    Fetches METAR, TAF, PIREPs, station and airport information, SIGMETs,
+    international SIGMETs, G-AIRMETs and CWAs concurrently. Hazards are
+    limited to those whose area covers the station.
+    
+    Args:
+        station: Station ICAO ID (e.g. 'KORD')
+        pirep_distance: Distance from the station to search for PIREPs
+        pirep_age: Hours back to search for PIREPs
+    
+    Returns:
+        One JSON document with a section per product, each with a 'fetched' timestamp
+        and either 'data' or an 'error' when that product could not be retrieved
+    """
+    try:
+        client = await get_client()
+        reference = await get_reference_cache()
+        result = await build_briefing(client, reference, station,
+                                      pirep_distance=pirep_distance, pirep_age=pirep_age)
+        return json.dumps(result)
+    except Exception as e:
+        logger.error(f"Error getting station briefing: {e}")
+        raise AviationWeatherError(f"Failed to get station briefing: {e}")
+
+@app.tool()
+@bound_tool
 async def get_station_info(
     ids: str = "",
     bbox: str = "",
@@ -330,6 +607,7 @@ async def get_station_info(
         raise AviationWeatherError(f"Failed to get station info: {e}")
 
 @app.tool()
+@bound_tool
 async def get_airport_info(
     ids: str = "",
     bbox: str = "",
@@ -359,6 +637,7 @@ async def get_airport_info(
         raise AviationWeatherError(f"Failed to get airport info: {e}")
 
 @app.tool()
+@bound_tool
 async def get_navaid_info(
     ids: str = "",
     bbox: str = "",
@@ -388,6 +667,7 @@ async def get_navaid_info(
         raise AviationWeatherError(f"Failed to get navaid info: {e}")
 
 @app.tool()
+@bound_tool
 async def get_fix_info(
     ids: str = "",
     bbox: str = "",
@@ -454,7 +734,10 @@ def run_stdio():
 # Cleanup function for the client
 async def cleanup():
     """Cleanup resources"""
-    global client
+    global client, wind_cache, metar_cache, reference_cache
+    wind_cache = None
+    metar_cache = None
+    reference_cache = None
     if client:
         await client.close()
         client = None
@@ -0,0 +1,172 @@
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .exceptions import APIError
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[\s,]*")
+_FEATURES_RE = re.compile(r'"features"\s*:\s*\[')
+_STRUCTURE_RE = re.compile(r'[{}\[\]"]')
+_STRING_END_RE = re.compile(r'["\\]')
+_SCALAR_END_RE = re.compile(r"[,\]\s]")
+
+# Don't scan an unbounded prefix looking for the record array
+MAX_PREFIX = 64 * 1024
+
+
+class _RecordScanner:
+    """Find where a record ends, one chunk at a time.
+
+    Tracks nesting depth and string/escape state across chunks, so each
+    character of a record is examined once no matter how many chunks it
+    spans.
+    """
+
+    def start(self, first: str) -> None:
+        """Begin a new record whose first character is first"""
+        self.scalar = first not in '{["'
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def scan(self, text: str, i: int) -> Optional[int]:
+        """Index in text just past the end of the record, or None if it continues"""
+        n = len(text)
+        if self.scalar:
+            # Scalars have no closing token; wait for a delimiter after them
+            match = _SCALAR_END_RE.search(text, i)
+            return match.start() if match else None
+
+        if self.escape:
+            if i >= n:
+                return None
+            i += 1
+            self.escape = False
+
+        while True:
+            if self.in_string:
+                match = _STRING_END_RE.search(text, i)
+                if match is None:
+                    return None
+                if match.group() == "\\":
+                    if match.end() >= n:
+                        # Escape split across chunks; skip its target next time
+                        self.escape = True
+                        return None
+                    i = match.end() + 1
+                    continue
+                self.in_string = False
+                i = match.end()
+                if self.depth == 0:
+                    return i
+            else:
+                match = _STRUCTURE_RE.search(text, i)
+                if match is None:
+                    return None
+                char = match.group()
+                i = match.end()
+                if char == '"':
+                    self.in_string = True
+                elif char in "{[":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return i
+
+
+async def iter_json_records(chunks: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """Yield the records of a JSON array or GeoJSON FeatureCollection as they arrive.
+
+    Only the record currently being decoded is buffered, so memory stays
+    proportional to the largest single record rather than the whole body.
+    Each record is scanned once and decoded once, after its end is found.
+    """
+    iterator = chunks.__aiter__()
+    scanner = _RecordScanner()
+
+    async def next_chunk() -> Optional[str]:
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    buffer = ""
+    pos = 0
+    started = False
+    while not started:
+        stripped = buffer.lstrip()
+        if stripped.startswith("["):
+            pos = len(buffer) - len(stripped) + 1
+            started = True
+        elif stripped.startswith("{"):
+            match = _FEATURES_RE.search(buffer)
+            if match:
+                pos = match.end()
+                started = True
+            elif len(buffer) > MAX_PREFIX:
+                raise APIError("Streamed JSON object has no 'features' array")
+        elif stripped:
+            raise APIError("Streamed response is not a JSON array or FeatureCollection")
+        if not started:
+            chunk = await next_chunk()
+            if chunk is None:
+                if buffer.strip():
+                    raise APIError("Streamed JSON ended before any records")
+                return
+            buffer += chunk
+
+    # Pieces of a record that spans chunks, joined once it is complete
+    parts: List[str] = []
+    while True:
+        if parts:
+            end = scanner.scan(buffer, pos)
+        else:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                chunk = await next_chunk()
+                if chunk is None:
+                    raise APIError("Streamed JSON ended inside the record array")
+                buffer, pos = chunk, 0
+                continue
+            if buffer[pos] == "]":
+                return
+            scanner.start(buffer[pos])
+            end = scanner.scan(buffer, pos)
+
+        if end is None:
+            parts.append(buffer[pos:])
+            chunk = await next_chunk()
+            if chunk is None:
+                raise APIError("Streamed JSON ended inside a record")
+            buffer, pos = chunk, 0
+            continue
+
+        try:
+            if parts:
+                parts.append(buffer[pos:end])
+                record, _ = _DECODER.raw_decode("".join(parts))
+                parts = []
+            else:
+                record, _ = _DECODER.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            raise APIError(f"Malformed record in streamed JSON: {e}")
+        pos = end
+        yield record
+
+
+def parse_fields(fields: str) -> Optional[List[str]]:
+    """Parse a comma-separated projection list; empty means keep everything"""
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    return names or None
+
+
+def project(record: Any, fields: Optional[List[str]]) -> Any:
+    """Keep only the requested fields of a record (or of a GeoJSON feature's properties)"""
+    if not fields or not isinstance(record, dict):
+        return record
+    if record.get("type") == "Feature" and isinstance(record.get("properties"), dict):
+        properties: Dict[str, Any] = record["properties"]
+        return {**record, "properties": {k: properties[k] for k in fields if k in properties}}
+    return {k: record[k] for k in fields if k in record}
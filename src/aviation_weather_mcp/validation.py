@@ -0,0 +1,228 @@
+import math
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict
+from urllib.parse import urlencode
+
+from .exceptions import ValidationError
+
+_STATION_RE = re.compile(r"^(@[A-Z]{2}|[A-Z0-9]{2,6})$")
+_DATE_FORMATS = ("%Y%m%d_%H%M", "%Y-%m-%dT%H:%M:%SZ", "%Y%m%d_%H%MZ", "%Y-%m-%dT%H:%MZ")
+CANONICAL_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Bounding boxes are widened to this many decimal places (~1 km)
+BBOX_PRECISION = 2
+
+Validator = Callable[[str, Any], Any]
+
+
+def station_ids(name: str, value: Any) -> str:
+    """Uppercase, dedupe and sort a comma/space separated list of station ids"""
+    ids = sorted({part.upper() for part in re.split(r"[,\s]+", str(value)) if part})
+    if not ids:
+        raise ValidationError(f"{name} must contain at least one station id")
+    for station in ids:
+        if not _STATION_RE.match(station):
+            raise ValidationError(f"Invalid station id '{station}' in {name}")
+    return ",".join(ids)
+
+
+def station_id(name: str, value: Any) -> str:
+    """A single station id"""
+    ids = station_ids(name, value)
+    if "," in ids:
+        raise ValidationError(f"{name} accepts a single station id, got '{value}'")
+    return ids
+
+
+def _coordinate(name: str, value: Any, limit: float) -> float:
+    if isinstance(value, bool):
+        raise ValidationError(f"{name} must be a number, got '{value}'")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{name} must be a number, got '{value}'")
+    if not -limit <= number <= limit:
+        raise ValidationError(f"{name} {value} is out of range [-{limit:g}, {limit:g}]")
+    return number
+
+
+def latitude(name: str, value: Any) -> float:
+    """A latitude in decimal degrees"""
+    return _coordinate(name, value, 90)
+
+
+def longitude(name: str, value: Any) -> float:
+    """A longitude in decimal degrees"""
+    return _coordinate(name, value, 180)
+
+
+def bbox(name: str, value: Any) -> str:
+    """Validate 'lat0,lon0,lat1,lon1' and widen it to a stable, rounded box"""
+    try:
+        lat0, lon0, lat1, lon1 = (float(part) for part in str(value).split(","))
+    except ValueError:
+        raise ValidationError(f"{name} must be 'lat0,lon0,lat1,lon1', got '{value}'")
+    for lat in (lat0, lat1):
+        if not -90 <= lat <= 90:
+            raise ValidationError(f"Latitude {lat} in {name} is out of range")
+    for lon in (lon0, lon1):
+        if not -180 <= lon <= 180:
+            raise ValidationError(f"Longitude {lon} in {name} is out of range")
+
+    scale = 10 ** BBOX_PRECISION
+
+    def down(x: float) -> str:
+        return f"{math.floor(x * scale) / scale:g}"
+
+    def up(x: float) -> str:
+        return f"{math.ceil(x * scale) / scale:g}"
+
+    return ",".join((down(min(lat0, lat1)), down(min(lon0, lon1)), up(max(lat0, lat1)), up(max(lon0, lon1))))
+
+
+def date(name: str, value: Any) -> str:
+    """Accept the documented date formats and normalize to ISO 8601 UTC"""
+    text = str(value).strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime(CANONICAL_DATE_FORMAT)
+        except ValueError:
+            continue
+    raise ValidationError(f"{name} must be 'yyyymmdd_hhmm' or 'yyyy-mm-ddThh:mm:ssZ', got '{value}'")
+
+
+def non_negative_int(name: str, value: Any) -> int:
+    """An integer >= 0"""
+    if isinstance(value, bool):
+        raise ValidationError(f"{name} must be an integer, got '{value}'")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{name} must be an integer, got '{value}'")
+    if number < 0 or number != float(value):
+        raise ValidationError(f"{name} must be a non-negative integer, got '{value}'")
+    return number
+
+
+def boolean(name: str, value: Any) -> bool:
+    """A boolean flag"""
+    if not isinstance(value, bool):
+        raise ValidationError(f"{name} must be true or false, got '{value}'")
+    return value
+
+
+def choice(*allowed: str) -> Validator:
+    """One of a fixed set of lowercase values"""
+    def validate(name: str, value: Any) -> str:
+        text = str(value).strip().lower()
+        if text not in allowed:
+            raise ValidationError(f"Invalid {name} '{value}', expected one of: {', '.join(allowed)}")
+        return text
+    return validate
+
+
+REGIONS = ("us", "bos", "mia", "chi", "dfw", "slc", "sfo", "alaska", "hawaii", "other_pac")
+
+# Parameters accepted by each upstream endpoint, mirroring TOOLS.md
+ENDPOINT_SCHEMAS: Dict[str, Dict[str, Validator]] = {
+    "metar": {
+        "ids": station_ids,
+        "format": choice("json", "xml", "raw", "geojson", "html"),
+        "taf": boolean,
+        "hours": non_negative_int,
+        "bbox": bbox,
+        "date": date,
+    },
+    "taf": {
+        "ids": station_ids,
+        "format": choice("json", "xml", "raw", "geojson", "html"),
+        "metar": boolean,
+        "bbox": bbox,
+        "time": choice("valid", "issue"),
+        "date": date,
+    },
+    "pirep": {
+        "id": station_id,
+        "format": choice("json", "xml", "raw", "geojson"),
+        "age": non_negative_int,
+        "distance": non_negative_int,
+        "level": non_negative_int,
+        "inten": choice("lgt", "mod", "sev"),
+        "date": date,
+    },
+    "airsigmet": {
+        "format": choice("json", "xml", "raw"),
+        "hazard": choice("conv", "turb", "ice", "ifr"),
+        "level": non_negative_int,
+        "date": date,
+    },
+    "isigmet": {
+        "format": choice("json", "xml", "raw"),
+        "hazard": choice("turb", "ice"),
+        "level": non_negative_int,
+        "date": date,
+    },
+    "gairmet": {
+        "type": choice("sierra", "tango", "zulu"),
+        "format": choice("decoded", "json", "geojson", "xml"),
+        "hazard": choice("turb-hi", "turb-lo", "llws", "sfc_wind", "ifr", "mtn_obs", "ice", "fzlvl"),
+        "date": date,
+    },
+    "cwa": {
+        "hazard": choice("ts", "turb", "ice", "ifr", "pcpn", "unk"),
+        "date": date,
+    },
+    "windtemp": {
+        "region": choice(*REGIONS),
+        "level": choice("low", "high"),
+        "fcst": choice("06", "12", "24"),
+    },
+    "stationinfo": {
+        "ids": station_ids,
+        "bbox": bbox,
+        "format": choice("json", "xml", "raw", "geojson"),
+    },
+    "airport": {
+        "ids": station_ids,
+        "bbox": bbox,
+        "format": choice("decoded", "json", "geojson"),
+    },
+    "navaid": {
+        "ids": station_ids,
+        "bbox": bbox,
+        "format": choice("json", "geojson", "raw"),
+    },
+    "fix": {
+        "ids": station_ids,
+        "bbox": bbox,
+        "format": choice("json", "geojson", "raw"),
+    },
+}
+
+
+def normalize_params(endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and canonicalize request parameters for an endpoint.
+
+    None and empty-string values are dropped. Raises ValidationError on
+    unknown endpoints, unknown parameters or invalid values.
+    """
+    schema = ENDPOINT_SCHEMAS.get(endpoint)
+    if schema is None:
+        raise ValidationError(f"Unknown endpoint '{endpoint}'")
+
+    normalized = {}
+    for name, value in params.items():
+        if value is None or value == "":
+            continue
+        validator = schema.get(name)
+        if validator is None:
+            raise ValidationError(f"Unknown parameter '{name}' for {endpoint}")
+        normalized[name] = validator(name, value)
+    return dict(sorted(normalized.items()))
+
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Stable key for a request; equivalent questions produce the same key"""
+    normalized = normalize_params(endpoint, params)
+    return f"{endpoint}?{urlencode({k: str(v).lower() if isinstance(v, bool) else v for k, v in normalized.items()})}"
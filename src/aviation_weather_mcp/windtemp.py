@@ -0,0 +1,424 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .exceptions import APIError, ValidationError
+from .validation import latitude, longitude, request_key
+
+logger = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+# FD winds are issued four times a day; a new cycle is usually on the wire
+# about two hours after the synoptic time it is based on.
+CYCLE_INTERVAL = timedelta(hours=6)
+ISSUE_DELAY = timedelta(hours=2)
+FALLBACK_TTL = 3600.0
+# A cycle that is late is re-checked at this interval rather than on every call
+LATE_CYCLE_RETRY = 600.0
+
+# Altitudes above which the FD product drops the temperature sign (always negative)
+NEGATIVE_TEMPS_ABOVE = 24000
+
+# ICAO prefix used to turn a 3-letter FD site into a stationinfo id
+REGION_ICAO_PREFIX = {
+    "alaska": "PA",
+    "hawaii": "PH",
+    "other_pac": "P",
+}
+
+LOW_LEVEL_CEILING = 39000
+EARTH_RADIUS_NM = 3440.065
+IDW_NEIGHBOURS = 4
+# Don't extrapolate winds from stations farther away than this
+MAX_STATION_DISTANCE_NM = 300.0
+
+_BASED_ON_RE = re.compile(r"DATA BASED ON (\d{2})(\d{2})(\d{2})Z")
+_TOKEN_RE = re.compile(r"\S+")
+
+
+def decode_group(group: str, altitude: int) -> Tuple[float, float, float]:
+    """Decode a single FD group into (direction, speed, temperature).
+
+    Missing values are returned as NaN. Light and variable winds ('9900')
+    decode to a NaN direction and zero speed.
+    """
+    group = group.strip()
+    if len(group) < 4 or not group[:4].isdigit():
+        return NAN, NAN, NAN
+
+    direction = int(group[:2]) * 10
+    speed = int(group[2:4])
+    if direction == 990 and speed == 0:
+        direction_value, speed_value = NAN, 0.0
+    else:
+        if direction > 360:
+            direction -= 500
+            speed += 100
+        direction_value, speed_value = float(direction % 360 or 360), float(speed)
+
+    temp_part = group[4:]
+    if not temp_part:
+        temperature = NAN
+    else:
+        try:
+            temperature = float(int(temp_part))
+        except ValueError:
+            temperature = NAN
+        else:
+            if altitude > NEGATIVE_TEMPS_ABOVE and temp_part[0] not in "+-":
+                temperature = -temperature
+    return direction_value, speed_value, temperature
+
+
+def wind_components(direction: float, speed: float) -> Tuple[float, float]:
+    """Return the (u, v) components of a wind blowing *from* direction"""
+    if math.isnan(speed):
+        return NAN, NAN
+    if math.isnan(direction) or speed == 0:
+        return 0.0, 0.0
+    rad = math.radians(direction)
+    return -speed * math.sin(rad), -speed * math.cos(rad)
+
+
+def wind_from_components(u: float, v: float) -> Tuple[Optional[float], Optional[float]]:
+    """Return (direction, speed) for the given (u, v) components"""
+    if math.isnan(u) or math.isnan(v):
+        return None, None
+    speed = math.hypot(u, v)
+    if speed < 0.5:
+        return None, 0.0
+    direction = math.degrees(math.atan2(-u, -v)) % 360
+    return round(direction) or 360, speed
+
+
+def great_circle_nm(lat0: float, lon0: float, lat1: float, lon1: float) -> float:
+    """Great-circle distance between two points in nautical miles"""
+    p0, p1 = math.radians(lat0), math.radians(lat1)
+    dlat = p1 - p0
+    dlon = math.radians(lon1 - lon0)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p0) * math.cos(p1) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def initial_course(lat0: float, lon0: float, lat1: float, lon1: float) -> float:
+    """Initial true course from the first point to the second, in degrees"""
+    p0, p1 = math.radians(lat0), math.radians(lat1)
+    dlon = math.radians(lon1 - lon0)
+    x = math.sin(dlon) * math.cos(p1)
+    y = math.cos(p0) * math.sin(p1) - math.sin(p0) * math.cos(p1) * math.cos(dlon)
+    return math.degrees(math.atan2(x, y)) % 360
+
+
+def _based_on_time(text: str, now: datetime) -> Optional[datetime]:
+    """Resolve the 'DATA BASED ON ddhhmmZ' stamp to a full UTC datetime"""
+    match = _BASED_ON_RE.search(text)
+    if not match:
+        return None
+    day, hour, minute = (int(g) for g in match.groups())
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    # Walk back at most a month to find the matching day
+    for _ in range(32):
+        if candidate.day == day and candidate <= now + timedelta(hours=1):
+            return candidate
+        candidate -= timedelta(days=1)
+    return None
+
+
+class WindTempGrid:
+    """Decoded FD winds for one region/level/forecast cycle.
+
+    Values are stored station-major in flat float arrays, so the value for
+    station ``i`` at altitude index ``j`` lives at ``i * len(altitudes) + j``.
+    Winds are kept as u/v components so they can be interpolated directly.
+    """
+
+    def __init__(self,
+                 stations: List[str],
+                 altitudes: List[int],
+                 u: array,
+                 v: array,
+                 temp: array,
+                 based_on: Optional[datetime] = None,
+                 lats: Optional[array] = None,
+                 lons: Optional[array] = None,
+                 fetched_at: Optional[float] = None):
+        self.stations = stations
+        self.altitudes = altitudes
+        self.u = u
+        self.v = v
+        self.temp = temp
+        self.based_on = based_on
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.lats = lats if lats is not None else array("d", [NAN] * len(stations))
+        self.lons = lons if lons is not None else array("d", [NAN] * len(stations))
+
+    @classmethod
+    def parse(cls, text: str, now: Optional[datetime] = None) -> "WindTempGrid":
+        """Parse the FD text product into a grid"""
+        now = now or datetime.now(timezone.utc)
+        lines = text.splitlines()
+
+        header_index = next((i for i, line in enumerate(lines) if line.startswith("FT")), None)
+        if header_index is None:
+            raise APIError("Wind/temp product has no 'FT' header line")
+
+        header = lines[header_index]
+        columns = [(m.end(), int(m.group())) for m in _TOKEN_RE.finditer(header) if m.group().isdigit()]
+        if not columns:
+            raise APIError("Wind/temp product has no altitude columns")
+        altitudes = [alt for _, alt in columns]
+        ends = [end for end, _ in columns]
+
+        stations: List[str] = []
+        u = array("f")
+        v = array("f")
+        temp = array("f")
+        for line in lines[header_index + 1:]:
+            tokens = list(_TOKEN_RE.finditer(line))
+            if not tokens or not re.fullmatch(r"[A-Z0-9]{3,4}", tokens[0].group()):
+                continue
+            row = [(NAN, NAN, NAN)] * len(altitudes)
+            for token in tokens[1:]:
+                # Groups are right-aligned under their altitude heading
+                col = min(range(len(ends)), key=lambda j: abs(ends[j] - token.end()))
+                row[col] = decode_group(token.group(), altitudes[col])
+            stations.append(tokens[0].group())
+            for direction, speed, temperature in row:
+                wu, wv = wind_components(direction, speed)
+                u.append(wu)
+                v.append(wv)
+                temp.append(temperature)
+
+        if not stations:
+            raise APIError("Wind/temp product contains no station rows")
+        return cls(stations, altitudes, u, v, temp, based_on=_based_on_time(text, now), fetched_at=now.timestamp())
+
+    @property
+    def expires_at(self) -> float:
+        """Epoch seconds after which the next cycle should be available"""
+        if self.based_on is None:
+            return self.fetched_at + FALLBACK_TTL
+        next_cycle = (self.based_on + CYCLE_INTERVAL + ISSUE_DELAY).timestamp()
+        # The next cycle is overdue when upstream publishes late; keep this one a while longer
+        return max(next_cycle, self.fetched_at + LATE_CYCLE_RETRY)
+
+    @property
+    def located(self) -> int:
+        """Number of stations with known coordinates"""
+        return sum(1 for lat in self.lats if not math.isnan(lat))
+
+    def set_locations(self, locations: Dict[str, Tuple[float, float]]) -> None:
+        """Attach coordinates to stations; unknown stations stay NaN"""
+        for i, station in enumerate(self.stations):
+            if station in locations:
+                self.lats[i], self.lons[i] = locations[station]
+
+    def _level_at(self, j: int, neighbours: List[Tuple[float, int]]) -> Tuple[float, float, float]:
+        """Inverse-distance weighted (u, v, temp) at altitude index j"""
+        n_alt = len(self.altitudes)
+        totals = [0.0, 0.0, 0.0]
+        weights = [0.0, 0.0, 0.0]
+        for distance, i in neighbours:
+            if distance < 1e-6:
+                weight = 1e12
+            else:
+                weight = 1.0 / (distance * distance)
+            k = i * n_alt + j
+            for slot, values in enumerate((self.u, self.v, self.temp)):
+                value = values[k]
+                if not math.isnan(value):
+                    totals[slot] += weight * value
+                    weights[slot] += weight
+        return tuple(t / w if w else NAN for t, w in zip(totals, weights))
+
+    def profile(self,
+                lat: float,
+                lon: float,
+                neighbours: int = IDW_NEIGHBOURS,
+                max_distance: float = MAX_STATION_DISTANCE_NM) -> List[Tuple[int, float, float, float]]:
+        """Spatially interpolated (altitude, u, v, temp) profile at a point.
+
+        Only stations within max_distance contribute; a point with none in
+        range raises ValidationError rather than extrapolating.
+        """
+        located = [
+            (great_circle_nm(lat, lon, self.lats[i], self.lons[i]), i)
+            for i in range(len(self.stations))
+            if not math.isnan(self.lats[i])
+        ]
+        if not located:
+            return []
+        located.sort()
+        nearest = [n for n in located[:neighbours] if n[0] <= max_distance]
+        if not nearest:
+            raise ValidationError(
+                f"Nearest wind/temp station is {located[0][0]:.0f} nm from {lat},{lon}, "
+                f"beyond the {max_distance:.0f} nm limit"
+            )
+        return [(alt, *self._level_at(j, nearest)) for j, alt in enumerate(self.altitudes)]
+
+
+def _interpolate(profile: List[Tuple[int, float, float, float]], altitude: float, slot: int) -> float:
+    """Linearly interpolate one profile column in altitude, without extrapolating"""
+    points = [(p[0], p[slot]) for p in profile if not math.isnan(p[slot])]
+    if not points:
+        return NAN
+    if altitude <= points[0][0]:
+        return points[0][1]
+    if altitude >= points[-1][0]:
+        return points[-1][1]
+    for (a0, v0), (a1, v1) in zip(points, points[1:]):
+        if a0 <= altitude <= a1:
+            return v0 + (v1 - v0) * (altitude - a0) / (a1 - a0)
+    return NAN
+
+
+def point_wind(grids: List[WindTempGrid], lat: float, lon: float, altitude: float) -> Dict[str, Any]:
+    """Wind and temperature at a point, interpolated across one or more grids"""
+    lat = latitude("lat", lat)
+    lon = longitude("lon", lon)
+    profile = sorted(p for grid in grids for p in grid.profile(lat, lon))
+    if not profile:
+        raise ValidationError("No located wind/temp stations are available for this region")
+    u = _interpolate(profile, altitude, 1)
+    v = _interpolate(profile, altitude, 2)
+    temp = _interpolate(profile, altitude, 3)
+    direction, speed = wind_from_components(u, v)
+    return {
+        "lat": lat,
+        "lon": lon,
+        "altitude": altitude,
+        "wdir": direction,
+        "wspd": round(speed) if speed is not None else None,
+        "temp": round(temp) if not math.isnan(temp) else None,
+        "u": u,
+        "v": v,
+    }
+
+
+def route_winds(grids: List[WindTempGrid],
+                route: List[Tuple[float, float]],
+                altitude: float,
+                tas: Optional[float] = None) -> Dict[str, Any]:
+    """Per-leg headwind/crosswind components along a route.
+
+    Each leg is evaluated at its midpoint. Positive headwind opposes the
+    direction of flight, positive crosswind blows from the right.
+    """
+    if len(route) < 2:
+        raise ValidationError("Route must contain at least two points")
+    route = [(latitude("route latitude", lat), longitude("route longitude", lon)) for lat, lon in route]
+
+    legs = []
+    total_distance = 0.0
+    weighted_headwind = 0.0
+    total_hours: Optional[float] = 0.0
+    for (lat0, lon0), (lat1, lon1) in zip(route, route[1:]):
+        distance = great_circle_nm(lat0, lon0, lat1, lon1)
+        course = initial_course(lat0, lon0, lat1, lon1)
+        wind = point_wind(grids, (lat0 + lat1) / 2, (lon0 + lon1) / 2, altitude)
+        if math.isnan(wind["u"]):
+            raise ValidationError(f"No wind data near leg {lat0},{lon0} -> {lat1},{lon1}")
+        rad = math.radians(course)
+        # Track unit vector is (sin, cos); wind vector (u, v) is where the air goes
+        tailwind = wind["u"] * math.sin(rad) + wind["v"] * math.cos(rad)
+        crosswind = wind["u"] * math.cos(rad) - wind["v"] * math.sin(rad)
+        leg = {
+            "from": [lat0, lon0],
+            "to": [lat1, lon1],
+            "distance_nm": round(distance, 1),
+            "course": round(course),
+            "wdir": wind["wdir"],
+            "wspd": wind["wspd"],
+            "temp": wind["temp"],
+            "headwind": round(-tailwind),
+            "crosswind": round(-crosswind),
+        }
+        if tas is not None:
+            # Crab into the crosswind, then add the along-track component
+            groundspeed = math.sqrt(max(tas * tas - crosswind * crosswind, 0.0)) + tailwind
+            leg["groundspeed"] = round(groundspeed)
+            if groundspeed <= 0:
+                total_hours = None
+            elif total_hours is not None:
+                total_hours += distance / groundspeed
+        legs.append(leg)
+        total_distance += distance
+        weighted_headwind += -tailwind * distance
+
+    summary = {
+        "altitude": altitude,
+        "distance_nm": round(total_distance, 1),
+        "avg_headwind": round(weighted_headwind / total_distance) if total_distance else 0,
+        "legs": legs,
+    }
+    if tas is not None and total_distance:
+        if total_hours:
+            summary["groundspeed"] = round(total_distance / total_hours)
+            summary["ete_minutes"] = round(total_hours * 60)
+        else:
+            summary["groundspeed"] = None
+            summary["ete_minutes"] = None
+    return summary
+
+
+class WindTempCache:
+    """Decoded FD grids keyed by (region, level, fcst), held until the next cycle"""
+
+    def __init__(self, client, clock: Callable[[], float] = time.time):
+        self.client = client
+        self.clock = clock
+        self._grids: Dict[str, WindTempGrid] = {}
+        self._locations: Dict[str, Tuple[float, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, region: str = "us", level: str = "low", fcst: str = "06") -> WindTempGrid:
+        """Return the grid for a product, fetching and parsing it at most once per cycle"""
+        key = request_key("windtemp", {"region": region, "level": level, "fcst": fcst})
+        grid = self._grids.get(key)
+        if grid is not None and self.clock() < grid.expires_at:
+            return grid
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            grid = self._grids.get(key)
+            if grid is not None and self.clock() < grid.expires_at:
+                return grid
+            text = await self.client.get_wind_temp(region=region, level=level, fcst=fcst)
+            grid = WindTempGrid.parse(str(text), now=datetime.fromtimestamp(self.clock(), timezone.utc))
+            await self._locate(grid, region.lower())
+            if not grid.located:
+                # Don't pin an unusable grid for the whole cycle; retry on the next call
+                raise APIError("Could not resolve locations for any wind/temp station")
+            self._grids[key] = grid
+            logger.info(f"Cached wind/temp grid {key}: {len(grid.stations)} stations, {len(grid.altitudes)} levels")
+            return grid
+
+    async def for_altitude(self, altitude: float, region: str = "us", fcst: str = "06") -> List[WindTempGrid]:
+        """Grids needed to interpolate at the given altitude"""
+        grids = [await self.get(region, "low", fcst)]
+        if altitude > LOW_LEVEL_CEILING:
+            grids.append(await self.get(region, "high", fcst))
+        return grids
+
+    async def _locate(self, grid: WindTempGrid, region: str) -> None:
+        """Resolve station coordinates through stationinfo, caching them for good"""
+        prefix = REGION_ICAO_PREFIX.get(region, "K")
+        missing = {f"{prefix}{s}" if len(s) == 3 else s: s for s in grid.stations if s not in self._locations}
+        if missing:
+            try:
+                info = await self.client.get_station_info(ids=",".join(sorted(missing)), format="json")
+            except Exception as e:
+                logger.warning(f"Could not resolve wind/temp station locations: {e}")
+                info = []
+            for station in info if isinstance(info, list) else []:
+                site = missing.get(station.get("icaoId"))
+                if site and station.get("lat") is not None and station.get("lon") is not None:
+                    self._locations[site] = (float(station["lat"]), float(station["lon"]))
+        grid.set_locations(self._locations)
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from aviation_weather_mcp.briefing import ReferenceCache, build_briefing, covers
+from aviation_weather_mcp.exceptions import NetworkError, ValidationError
+
+SQUARE = [{"lat": 40, "lon": -90}, {"lat": 45, "lon": -90}, {"lat": 45, "lon": -85}, {"lat": 40, "lon": -85}]
+
+
+class FakeClient:
+    def __init__(self):
+        self.station_info_calls = 0
+
+    async def get_metar(self, **kwargs):
+        return [{"icaoId": "KORD", "rawOb": "KORD 191651Z", "extra": 1}]
+
+    async def get_taf(self, **kwargs):
+        raise NetworkError("upstream unavailable")
+
+    async def get_pirep(self, **kwargs):
+        return []
+
+    async def get_station_info(self, **kwargs):
+        self.station_info_calls += 1
+        await asyncio.sleep(0)
+        return [{"icaoId": "KORD", "lat": 41.98, "lon": -87.9}]
+
+    async def get_airport_info(self, **kwargs):
+        return [{"icaoId": "KORD", "name": "Chicago O'Hare Intl"}]
+
+    async def stream_records(self, endpoint, params):
+        yield {"hazard": "TURB", "coords": SQUARE}
+        yield {"hazard": "ICE", "coords": [{"lat": 30, "lon": -100}, {"lat": 35, "lon": -100}, {"lat": 35, "lon": -95}]}
+
+
+def test_covers():
+    assert covers({"coords": SQUARE}, 42, -87)
+    assert not covers({"coords": SQUARE}, 30, -87)
+    assert covers({}, 0, 0)
+
+
+def test_briefing_merges_sections_and_keeps_partial_results():
+    client = FakeClient()
+    briefing = asyncio.run(build_briefing(client, ReferenceCache(client), "kord"))
+    assert briefing["id"] == "KORD"
+    assert briefing["metar"]["data"] == [{"icaoId": "KORD", "rawOb": "KORD 191651Z"}]
+    assert "upstream unavailable" in briefing["taf"]["error"]
+    assert briefing["sigmet"]["data"] == [{"hazard": "TURB"}]
+    assert all("fetched" in section for key, section in briefing.items() if key != "id")
+
+
+@pytest.mark.parametrize("station", ["@WA", "KO", "KORD,KJFK", "KORD1"])
+def test_briefing_requires_single_airport_id(station):
+    client = FakeClient()
+    with pytest.raises(ValidationError):
+        asyncio.run(build_briefing(client, ReferenceCache(client), station))
+
+
+def test_reference_cache_fetches_once_under_concurrency():
+    client = FakeClient()
+    cache = ReferenceCache(client)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("station", "KORD") for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert client.station_info_calls == 1
+    assert all(r == results[0] for r in results)
@@ -0,0 +1,183 @@
+import asyncio
+import math
+
+import pytest
+
+from aviation_weather_mcp.flightcat import (
+    IFR,
+    LIFR,
+    MVFR,
+    NO_CEILING,
+    VFR,
+    MetarColumns,
+    MetarSnapshotCache,
+    keep_latest,
+    parse_ceiling,
+    parse_visibility,
+)
+from aviation_weather_mcp.validation import request_key
+
+
+def metar(station, lat, lon, ceiling=None, visib="10+", obs_time=1000):
+    clouds = [{"cover": "OVC", "base": ceiling}] if ceiling is not None else []
+    return {"icaoId": station, "lat": lat, "lon": lon, "clouds": clouds, "visib": visib, "obsTime": obs_time}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("10+", 10.0),
+    ("P6SM", 6.0),
+    ("M1/4SM", 0.25),
+    ("1 1/2", 1.5),
+    ("3SM", 3.0),
+    (0.5, 0.5),
+])
+def test_parse_visibility(value, expected):
+    assert parse_visibility(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "abc", "1/0", "1/2/3"])
+def test_parse_visibility_malformed(value):
+    assert math.isnan(parse_visibility(value))
+
+
+def test_parse_ceiling_uses_lowest_ceiling_layer():
+    clouds = [{"cover": "FEW", "base": 500}, {"cover": "BKN", "base": 2500}, {"cover": "OVC", "base": 1200}]
+    assert parse_ceiling({"clouds": clouds}) == 1200
+
+
+def test_parse_ceiling_ovx():
+    assert parse_ceiling({"clouds": [{"cover": "OVX", "base": 0}]}) == 0
+
+
+def test_parse_ceiling_without_ceiling_layer():
+    assert parse_ceiling({"clouds": [{"cover": "SCT", "base": 800}]}) == NO_CEILING
+    assert parse_ceiling({}) == NO_CEILING
+
+
+def test_parse_ceiling_vertical_visibility_in_hundreds_or_feet():
+    assert parse_ceiling({"vertVis": 5}) == 500
+    assert parse_ceiling({"vertVis": 800}) == 800
+    assert parse_ceiling({"clouds": [{"cover": "OVC", "base": 300}], "vertVis": 5}) == 300
+
+
+@pytest.mark.parametrize("ceiling, visibility, expected", [
+    (499, 10, LIFR),
+    (500, 10, IFR),
+    (999, 10, IFR),
+    (1000, 10, MVFR),
+    (3000, 10, MVFR),
+    (3001, 10, VFR),
+    (NO_CEILING, 0.99, LIFR),
+    (NO_CEILING, 1, IFR),
+    (NO_CEILING, 2.99, IFR),
+    (NO_CEILING, 3, MVFR),
+    (NO_CEILING, 5, MVFR),
+    (NO_CEILING, 5.01, VFR),
+    (NO_CEILING, math.nan, VFR),
+])
+def test_categorize_boundaries(ceiling, visibility, expected):
+    assert MetarColumns._categorize(ceiling, visibility) == expected
+
+
+def test_keep_latest_with_history():
+    latest = {}
+    for obs_time in (2000, 3000, 1000):
+        keep_latest(latest, metar("KORD", 41.98, -87.9, obs_time=obs_time))
+    keep_latest(latest, {"icaoId": "KXXX", "obsTime": 4000})
+    assert list(latest) == ["KORD"]
+    assert latest["KORD"]["obsTime"] == 3000
+
+
+def test_columns_keep_latest_report_per_station():
+    columns = MetarColumns([
+        metar("KORD", 41.98, -87.9, ceiling=400, obs_time=1000),
+        metar("KORD", 41.98, -87.9, obs_time=2000),
+    ])
+    assert len(columns) == 1
+    assert columns.categories[0] == VFR
+
+
+def test_summarize_buckets_negative_longitudes():
+    columns = MetarColumns([
+        metar("KORD", 41.98, -87.9, ceiling=800),
+        metar("KMDW", 41.79, -87.1, ceiling=400),
+        metar("KUGN", 42.42, -87.0, ceiling=2000),
+        metar("KRFD", 42.2, -89.1),
+    ])
+    summary = columns.summarize(cell_size=1.0)
+    assert summary["counts"] == {"VFR": 1, "MVFR": 1, "IFR": 1, "LIFR": 1}
+
+    cells = {(cell["lat"], cell["lon"]): cell for cell in summary["cells"]}
+    # floor(-87.9) and floor(-87.1) share the cell starting at -88
+    assert set(cells) == {(41.0, -88.0), (42.0, -87.0)}
+    assert cells[(41.0, -88.0)]["worst"] == "KMDW"
+    assert cells[(41.0, -88.0)]["IFR"] == 1 and cells[(41.0, -88.0)]["LIFR"] == 1
+    assert cells[(42.0, -87.0)]["worst_cat"] == "MVFR"
+
+
+def test_summarize_ranks_worst_stations():
+    columns = MetarColumns([
+        metar("AAAA", 40.0, -90.0, ceiling=900),
+        metar("BBBB", 40.0, -90.0, ceiling=600),
+        metar("CCCC", 40.0, -90.0, ceiling=300),
+        metar("DDDD", 40.0, -90.0),
+    ])
+    summary = columns.summarize(worst=2)
+    assert [s["id"] for s in summary["worst"]] == ["CCCC", "BBBB"]
+    assert summary["worst"][0]["cat"] == "LIFR"
+    assert columns.summarize(worst=0)["worst"] == []
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def stream_records(self, endpoint, params):
+        self.calls += 1
+        await asyncio.sleep(0)
+        yield metar("KORD", 41.98, -87.9, ceiling=800)
+        yield "not a record"
+
+
+def test_snapshot_cache_shares_fetch_and_respects_ttl():
+    client = FakeClient()
+    now = [1000.0]
+    cache = MetarSnapshotCache(client, ttl=300, clock=lambda: now[0])
+
+    async def scenario():
+        first, second = await asyncio.gather(cache.get(bbox="40,-90,45,-85"), cache.get(bbox="40,-90,45,-85"))
+        assert first is second
+        assert client.calls == 1
+        assert len(first) == 1
+
+        now[0] += 299
+        assert await cache.get(bbox="40,-90,45,-85") is first
+        now[0] += 1
+        assert await cache.get(bbox="40,-90,45,-85") is not first
+        assert client.calls == 2
+
+    asyncio.run(scenario())
+
+
+def key(bbox):
+    return request_key("metar", {"bbox": bbox, "format": "json"})
+
+
+def test_snapshot_cache_evicts_expired_and_oldest_entries():
+    client = FakeClient()
+    now = [1000.0]
+    cache = MetarSnapshotCache(client, ttl=300, max_snapshots=2, clock=lambda: now[0])
+
+    async def scenario():
+        await cache.get(bbox="40,-90,41,-89")
+        now[0] += 400
+        await cache.get(bbox="41,-90,42,-89")
+        # The first snapshot expired and is dropped along with its lock
+        assert len(cache._snapshots) == 1
+        await cache.get(bbox="42,-90,43,-89")
+        await cache.get(bbox="43,-90,44,-89")
+        assert len(cache._snapshots) == 2
+        assert len(cache._locks) == 2
+        assert list(cache._snapshots) == [key("42,-90,43,-89"), key("43,-90,44,-89")]
+
+    asyncio.run(scenario())
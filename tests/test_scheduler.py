@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from aviation_weather_mcp.scheduler import FairScheduler, bind_request, current_session, remaining_time
+
+
+def test_free_slots_are_granted_immediately():
+    async def scenario():
+        scheduler = FairScheduler(2)
+        await scheduler.acquire("a")
+        await scheduler.acquire("b")
+        assert scheduler._active == 2
+        scheduler.release()
+        scheduler.release()
+        assert scheduler._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiting_sessions_are_served_round_robin():
+    async def scenario():
+        scheduler = FairScheduler(1)
+        order = []
+
+        async def job(session):
+            async with scheduler.slot(session):
+                order.append(session)
+                await asyncio.sleep(0)
+
+        await scheduler.acquire("holder")
+        tasks = [asyncio.create_task(job("heavy")) for _ in range(4)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(job("light")) for _ in range(2)]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(scenario())
+    assert order == ["heavy", "light", "heavy", "light", "heavy", "heavy"]
+    assert scheduler._active == 0
+    assert not scheduler._ring and not scheduler._queues
+
+
+def test_cancelled_waiter_is_removed_from_queue():
+    async def scenario():
+        scheduler = FairScheduler(1)
+        await scheduler.acquire("holder")
+        waiter = asyncio.create_task(scheduler.acquire("a"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert not scheduler._ring and not scheduler._queues
+        scheduler.release()
+        assert scheduler._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_granted_to_cancelled_waiter_is_passed_on():
+    async def scenario():
+        scheduler = FairScheduler(1)
+        await scheduler.acquire("holder")
+        first = asyncio.create_task(scheduler.acquire("a"))
+        second = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        # Grant the slot to "a", then cancel it before it resumes
+        scheduler.release()
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await second
+        assert scheduler._active == 1
+        scheduler.release()
+        assert scheduler._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_bind_request_sets_session_and_deadline():
+    async def scenario():
+        bind_request("session-1", 5.0)
+        assert current_session.get() == "session-1"
+        assert 4.0 < remaining_time(30.0) <= 5.0
+        bind_request("session-2", None)
+        assert remaining_time(30.0) == 30.0
+
+    asyncio.run(scenario())
+
+
+def test_remaining_time_goes_negative_after_deadline():
+    async def scenario():
+        bind_request("s", 0.0)
+        time.sleep(0.001)
+        assert remaining_time(30.0) < 0
+
+    asyncio.run(scenario())
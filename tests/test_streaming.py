@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from aviation_weather_mcp import streaming
+from aviation_weather_mcp.exceptions import APIError
+from aviation_weather_mcp.streaming import iter_json_records, parse_fields, project
+
+
+async def _chunks(text, size):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def records(text, size):
+    async def collect():
+        return [r async for r in iter_json_records(_chunks(text, size))]
+    return asyncio.run(collect())
+
+
+RECORDS = [
+    {"icaoId": "KORD", "rawOb": "KORD 191651Z [brackets] {braces}", "clouds": [{"cover": "BKN", "base": 1500}]},
+    {"quote": "say \"hi\" \\ back", "nested": [[1, 2], {"x": None}]},
+    "plain string with ] inside",
+    12345,
+    -0.5,
+    True,
+    None,
+    [],
+    {},
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_array_records_survive_any_chunk_boundary(size):
+    assert records(json.dumps(RECORDS), size) == RECORDS
+
+
+@pytest.mark.parametrize("size", [1, 3, 4096])
+def test_feature_collection_yields_features(size):
+    features = [{"type": "Feature", "properties": {"a": i}, "geometry": None} for i in range(5)]
+    text = json.dumps({"type": "FeatureCollection", "features": features})
+    assert records(text, size) == features
+
+
+def test_scalars_split_at_chunk_boundaries():
+    assert records("[12345, 678]", 3) == [12345, 678]
+    assert records("[true,false,null]", 2) == [True, False, None]
+
+
+def test_escape_split_across_chunks():
+    text = json.dumps(["a\\\"b"])
+    for size in range(1, len(text) + 1):
+        assert records(text, size) == ["a\\\"b"]
+
+
+def test_empty_inputs():
+    assert records("", 10) == []
+    assert records(" [ ] ", 1) == []
+
+
+def test_each_record_is_decoded_once(monkeypatch):
+    calls = []
+    decoder = streaming._DECODER
+
+    class CountingDecoder:
+        def raw_decode(self, *args):
+            calls.append(1)
+            return decoder.raw_decode(*args)
+
+    monkeypatch.setattr(streaming, "_DECODER", CountingDecoder())
+    big = [{"values": list(range(5000))} for _ in range(3)]
+    assert records(json.dumps(big), 512) == big
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("text", [
+    "[{\"a\": 1}",
+    "[{\"a\": 1},",
+    "{\"type\": \"x\"}",
+    "<html></html>",
+    "[{\"a\": }]",
+])
+def test_malformed_input_raises(text):
+    with pytest.raises(APIError):
+        records(text, 4)
+
+
+def test_project_plain_record_and_feature():
+    assert project({"a": 1, "b": 2}, ["a"]) == {"a": 1}
+    feature = {"type": "Feature", "properties": {"a": 1, "b": 2}, "geometry": None}
+    assert project(feature, ["b"]) == {"type": "Feature", "properties": {"b": 2}, "geometry": None}
+    assert project({"a": 1}, None) == {"a": 1}
+
+
+def test_parse_fields():
+    assert parse_fields(" icaoId, rawOb ,") == ["icaoId", "rawOb"]
+    assert parse_fields("") is None
@@ -0,0 +1,63 @@
+import pytest
+
+from aviation_weather_mcp.exceptions import ValidationError
+from aviation_weather_mcp.validation import normalize_params, request_key
+
+
+def test_ids_are_uppercased_deduplicated_and_sorted():
+    params = normalize_params("metar", {"ids": "kord, KJFK kord"})
+    assert params["ids"] == "KJFK,KORD"
+
+
+def test_state_selector_is_accepted():
+    assert normalize_params("metar", {"ids": "@wa"})["ids"] == "@WA"
+
+
+def test_bbox_is_ordered_and_rounded_outward():
+    params = normalize_params("metar", {"bbox": "45,-85.123,40.001,-90"})
+    assert params["bbox"] == "40,-90,45,-85.12"
+
+
+def test_dates_are_normalized_to_iso():
+    assert normalize_params("metar", {"date": "20231220_1200"})["date"] == "2023-12-20T12:00:00Z"
+    assert normalize_params("metar", {"date": "2023-12-20T12:00:00Z"})["date"] == "2023-12-20T12:00:00Z"
+
+
+def test_enum_values_are_lowercased():
+    assert normalize_params("airsigmet", {"hazard": "TURB", "format": "JSON"}) == {"format": "json", "hazard": "turb"}
+
+
+def test_none_and_empty_values_are_dropped():
+    assert normalize_params("metar", {"ids": None, "bbox": "", "format": "json"}) == {"format": "json"}
+
+
+def test_equivalent_requests_share_a_key():
+    a = request_key("metar", {"ids": "kord KJFK", "format": "json", "date": "20231220_1200"})
+    b = request_key("metar", {"date": "2023-12-20T12:00:00Z", "format": "JSON", "ids": "KJFK,KORD,kjfk"})
+    assert a == b
+
+
+def test_booleans_are_encoded_lowercase_in_key():
+    assert "taf=false" in request_key("metar", {"taf": False})
+
+
+@pytest.mark.parametrize("endpoint, params", [
+    ("metar", {"bbox": "1,2,3"}),
+    ("metar", {"bbox": "95,0,96,1"}),
+    ("metar", {"bbox": "0,-190,1,0"}),
+    ("metar", {"date": "yesterday"}),
+    ("metar", {"hours": -1}),
+    ("metar", {"hours": 1.5}),
+    ("metar", {"hours": True}),
+    ("metar", {"taf": "yes"}),
+    ("metar", {"ids": "K$$"}),
+    ("metar", {"ids": ", ,"}),
+    ("metar", {"unknown": 1}),
+    ("airsigmet", {"hazard": "tornado"}),
+    ("windtemp", {"region": "mars"}),
+    ("pirep", {"id": "KORD,KJFK"}),
+    ("nowhere", {}),
+])
+def test_invalid_input_raises(endpoint, params):
+    with pytest.raises(ValidationError):
+        normalize_params(endpoint, params)
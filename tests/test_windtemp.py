@@ -0,0 +1,196 @@
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from aviation_weather_mcp.exceptions import APIError, ValidationError
+from aviation_weather_mcp.windtemp import (
+    LATE_CYCLE_RETRY,
+    WindTempCache,
+    WindTempGrid,
+    decode_group,
+    point_wind,
+    route_winds,
+)
+
+FD_TEXT = """(Extracted from FBUS31 KWNO 191358)
+FD1US1
+DATA BASED ON 191200Z
+VALID 191800Z   FOR USE 1400-2100Z. TEMPS NEG ABV 24000
+
+FT  3000    6000    9000   12000   18000   24000  30000  34000  39000
+BDL 3013 3018-03 3024-07 3031-11 3043-23 3052-34 305549 306059 306263
+BOS      9900+02 2922-06 2930-10 7315-22 3052-34 305549 306059 306263
+"""
+
+NOW = datetime(2026, 10, 19, 14, tzinfo=timezone.utc)
+
+
+def test_decode_group_with_temperature():
+    assert decode_group("3018-03", 6000) == (300.0, 18.0, -3.0)
+
+
+def test_decode_group_implied_negative_temperature_above_24000():
+    assert decode_group("305549", 30000) == (300.0, 55.0, -49.0)
+
+
+def test_decode_group_over_100_knots():
+    assert decode_group("7315-22", 18000) == (230.0, 115.0, -22.0)
+
+
+def test_decode_group_light_and_variable():
+    direction, speed, temperature = decode_group("9900+02", 6000)
+    assert math.isnan(direction)
+    assert speed == 0.0
+    assert temperature == 2.0
+
+
+def test_decode_group_missing():
+    assert all(math.isnan(x) for x in decode_group("", 3000))
+
+
+def test_parse_aligns_columns_with_blank_leading_group():
+    grid = WindTempGrid.parse(FD_TEXT, now=NOW)
+    assert grid.stations == ["BDL", "BOS"]
+    assert grid.altitudes == [3000, 6000, 9000, 12000, 18000, 24000, 30000, 34000, 39000]
+    assert grid.based_on == datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+
+    n_alt = len(grid.altitudes)
+    # BOS has no 3000 ft group; its first group belongs under 6000
+    assert math.isnan(grid.u[n_alt])
+    assert grid.temp[n_alt + 1] == 2.0
+    assert grid.temp[n_alt + 6] == -49.0
+
+
+def test_parse_without_header_raises():
+    with pytest.raises(APIError):
+        WindTempGrid.parse("no data here", now=NOW)
+
+
+def test_point_wind_at_station_matches_decoded_values():
+    grid = WindTempGrid.parse(FD_TEXT, now=NOW)
+    grid.set_locations({"BDL": (41.94, -72.68), "BOS": (42.36, -71.01)})
+    wind = point_wind([grid], 41.94, -72.68, 6000)
+    assert wind["wdir"] == 300
+    assert wind["wspd"] == 18
+    assert wind["temp"] == -3
+
+
+def test_point_wind_rejects_out_of_range_coordinates():
+    grid = WindTempGrid.parse(FD_TEXT, now=NOW)
+    grid.set_locations({"BDL": (41.94, -72.68), "BOS": (42.36, -71.01)})
+    with pytest.raises(ValidationError):
+        point_wind([grid], 500, -72.68, 6000)
+    with pytest.raises(ValidationError):
+        point_wind([grid], 41.94, -200, 6000)
+
+
+def test_point_wind_refuses_to_extrapolate_from_distant_stations():
+    grid = WindTempGrid.parse(FD_TEXT, now=NOW)
+    grid.set_locations({"BDL": (41.94, -72.68), "BOS": (42.36, -71.01)})
+    with pytest.raises(ValidationError, match="nm limit"):
+        point_wind([grid], 0, 0, 6000)
+
+
+def test_route_winds_rejects_out_of_range_points():
+    grid = WindTempGrid.parse(FD_TEXT, now=NOW)
+    grid.set_locations({"BDL": (41.94, -72.68), "BOS": (42.36, -71.01)})
+    with pytest.raises(ValidationError):
+        route_winds([grid], [(41.94, -72.68), (142.36, -71.01)], 6000)
+
+
+def test_expires_at_follows_next_cycle():
+    grid = WindTempGrid.parse(FD_TEXT, now=NOW)
+    assert grid.expires_at == datetime(2026, 10, 19, 20, tzinfo=timezone.utc).timestamp()
+
+
+def test_expires_at_keeps_late_cycle_for_retry_interval():
+    # Fetched after the next cycle was due, the grid must not be born expired
+    late = datetime(2026, 10, 19, 21, tzinfo=timezone.utc)
+    grid = WindTempGrid.parse(FD_TEXT, now=late)
+    assert grid.expires_at == late.timestamp() + LATE_CYCLE_RETRY
+
+
+def _single_station_grid(direction, speed):
+    grid = WindTempGrid.parse(
+        "FT  3000    6000\n"
+        f"AAA {direction // 10:02d}{speed:02d} {direction // 10:02d}{speed:02d}+05\n",
+        now=NOW,
+    )
+    grid.set_locations({"AAA": (40.0, -90.0)})
+    return grid
+
+
+def test_route_groundspeed_uses_wind_triangle():
+    # Due east at 100 kt TAS with a 50 kt direct crosswind from the north
+    grid = _single_station_grid(360, 50)
+    result = route_winds([grid], [(40.0, -91.0), (40.0, -89.0)], 6000, tas=100)
+    leg = result["legs"][0]
+    assert abs(leg["headwind"]) <= 1
+    # sqrt(100^2 - 50^2) ~= 87; the great-circle course is not exactly 090
+    assert abs(leg["groundspeed"] - 87) <= 1
+    assert abs(result["groundspeed"] - 87) <= 1
+
+
+def test_route_ete_sums_leg_times():
+    grid = _single_station_grid(270, 50)
+    # Eastbound with a tailwind, then westbound into a headwind
+    route = [(40.0, -91.0), (40.0, -89.0), (40.0, -91.0)]
+    result = route_winds([grid], route, 6000, tas=100)
+    leg_distance = result["legs"][0]["distance_nm"]
+    expected_hours = leg_distance / 150 + leg_distance / 50
+    assert result["ete_minutes"] == round(expected_hours * 60)
+
+
+class FakeClient:
+    def __init__(self, fail_station_info=True):
+        self.station_info_calls = 0
+        self.wind_temp_calls = 0
+        self.fail_station_info = fail_station_info
+
+    async def get_wind_temp(self, **kwargs):
+        self.wind_temp_calls += 1
+        return FD_TEXT
+
+    async def get_station_info(self, **kwargs):
+        self.station_info_calls += 1
+        if self.fail_station_info:
+            raise RuntimeError("upstream unavailable")
+        return [
+            {"icaoId": "KBDL", "lat": 41.94, "lon": -72.68},
+            {"icaoId": "KBOS", "lat": 42.36, "lon": -71.01},
+        ]
+
+
+def test_cache_does_not_keep_grid_without_locations():
+    client = FakeClient()
+    cache = WindTempCache(client, clock=NOW.timestamp)
+
+    async def scenario():
+        with pytest.raises(APIError):
+            await cache.get()
+        client.fail_station_info = False
+        grid = await cache.get()
+        assert grid.located == 2
+        assert await cache.get() is grid
+
+    asyncio.run(scenario())
+    assert client.station_info_calls == 2
+
+
+def test_cache_holds_late_cycle_until_retry_interval():
+    client = FakeClient(fail_station_info=False)
+    now = [datetime(2026, 10, 19, 21, tzinfo=timezone.utc)]
+    cache = WindTempCache(client, clock=lambda: now[0].timestamp())
+
+    async def scenario():
+        grid = await cache.get()
+        now[0] += timedelta(minutes=5)
+        assert await cache.get() is grid
+        assert client.wind_temp_calls == 1
+        now[0] += timedelta(seconds=LATE_CYCLE_RETRY)
+        assert await cache.get() is not grid
+        assert client.wind_temp_calls == 2
+
+    asyncio.run(scenario())